@@ -1,69 +1,76 @@
 import numpy as np
 from typing import List, Tuple
-from scipy.sparse import csc_array
-from scipy.sparse.linalg import spsolve
+from scipy.sparse import csr_array, eye_array
+from scipy.sparse.linalg import splu
 
 def get_node_to_int_map(nodes: list) -> dict:
     return {node: i for i, node in enumerate(nodes)}
 
+def to_csr(delegations: dict, nodes: list, node_to_int: dict) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Converts the incoming delegations into CSR arrays (indptr, cols, data). The nodes delegating to the node with
+    index v are cols[indptr[v]:indptr[v+1]], and data holds the delegated weights at the same positions.
+    """
+    indptr = [0]
+    cols = []
+    data = []
+
+    for v in nodes:
+        incomings = delegations.get(v, {})
+        cols += [node_to_int[u] for u in incomings]
+        data += incomings.values()
+        indptr.append(len(cols))
+
+    return np.array(indptr, dtype=np.int64), np.array(cols, dtype=np.int64), np.array(data, dtype=np.float64)
+
 def set_up(delegations: dict, nodes: list):
 
     n = len(nodes)
     node_to_int = get_node_to_int_map(nodes)
 
-    # Finds sink nodes, since they get treated different when building the matrix
-    outgoing_nodes = {src for node in delegations for src, weight in delegations[node].items() if weight > 0}
-    sink_nodes = [node for node in nodes if node not in outgoing_nodes]
+    indptr, cols, data = to_csr(delegations, nodes, node_to_int)
 
-    # We will assemble A in coordinate format: lists of (row, col, data)
-    rows = []
-    cols = []
-    data = []
+    # Finds sink nodes. A positive weight in column u is a delegation going out of u
+    has_outgoing = np.zeros(n, dtype=bool)
+    has_outgoing[cols[data > 0]] = True
+    sink_nodes = [nodes[i] for i in np.flatnonzero(~has_outgoing)]
 
-    for v in nodes:
-        v_int = node_to_int[v]
-        # Diagonal entry: 1 * p_v
-        rows.append(v_int)
-        cols.append(v_int)
-        data.append(1.0)
+    # Row v of A holds 1 * p_v minus the incoming weights -w_{uv} * p_u, so A = I - W with W the incoming delegations
+    W = csr_array((data, cols, indptr), shape=(n, n))
+    A = eye_array(n, format="csr") - W
 
-        # Subtract incoming weights:  -w_{uv} * p_u
-        for u, w in delegations.get(v, {}).items():
-            u_int = node_to_int[u]
-            rows.append(v_int)
-            cols.append(u_int)
-            data.append(-w)
-
-    # Create sparse matrix A in CSC format:
-    A = csc_array((data, (rows, cols)), shape=(n, n))
-
-    b = np.array([1] * len(nodes))
+    b = np.ones(n, dtype=np.float64)
 
     return A, b, sink_nodes
 
+def factorize(A):
+    """
+    Computes the sparse LU factorization of A. The returned object's solve(b) may be called repeatedly to solve
+    for several right-hand sides without factorizing A again.
+    """
+    try:
+        return splu(A.tocsc(), options={"SymmetricMode": False})
+    except RuntimeError as e:
+        # SuperLU reports a singular matrix as a RuntimeError
+        raise ValueError(f"Linear system is unsolvable: {e}")
+
 def solve(A, b, sinks=None):
 
     # An empty graph would break the LE solver
     if A.size == 0:
         return {}, []
     
-    try:
-        #x = np.linalg.solve(A, b)
-        x = spsolve(A, b)
-    except np.linalg.LinAlgError as e:
-        raise ValueError(f"Linear system is unsolvable: {e}")
-    
-    return x
+    return factorize(A).solve(b)
 
 def resolve_delegations(delegations: dict, nodes: List[str]) -> Tuple[dict, list]:  
 
     A, b, sink_nodes = set_up(delegations, nodes)
     x = solve(A, b)
 
-    node_to_int_map = get_node_to_int_map(nodes)
+    sink_set = set(sink_nodes)
 
-    # Create a dictionary to store the resolved powers
-    powers = {node: (float(x[node_to_int_map[node]]) if node in sink_nodes else 0.0) for node in nodes}
+    # Create a dictionary to store the resolved powers. The position of a node in nodes is its index in x
+    powers = {node: (float(x[i]) if node in sink_set else 0.0) for i, node in enumerate(nodes)}
 
     return powers, sink_nodes
 
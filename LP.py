@@ -1,48 +1,32 @@
+import LE
 import logger_creator
 import numpy as np
 from datetime import datetime
-from pulp import *
-
-# These two are necessary, since PuLP needs variables to be strings, but they may be input as integers or other types
-# Eg. a node being called either 1 or '1'
-def get_node_to_str_map(nodes: list) -> dict:
-    return {node: str(node) for node in nodes}
-
-def get_str_to_node_map(nodes: list) -> dict:
-    return {str(node): node for node in nodes}
+from typing import List, Tuple
+from scipy.optimize import linprog
 
 def set_up(delegations: dict, nodes: list):
     """
-    nodes need to be strings
+    Builds the constraints p_v = 1 + sum(w_uv * p_u) of every node as a sparse equality system A_eq * p = b_eq.
+    The system is the same one the linear systems solver uses, so the assembly is shared with LE.py.
     """
+    return LE.set_up(delegations, nodes)
 
-    node_to_str = get_node_to_str_map(nodes)
-
-    # Initialize LP model
-    model = LpProblem("DelegationResolution", LpMinimize)
-    
-    # Initialize LP variables
-    lp_vars = {node: LpVariable(node_to_str[node]) for node in nodes}
 
-    # Identify sink and non-sink nodes. Outgoing nodes are those that have delegations going out of them
-    outgoing_nodes = {src for node in delegations for src, weight in delegations[node].items() if weight > 0}
-    sink_nodes = [node for node in nodes if node not in outgoing_nodes]
-    
-    # Add constraints for each node
-    for node in nodes:
-        incomings = delegations.get(node, {})
-        model += (lp_vars[node] == 1 + sum(weight * lp_vars[src] for src, weight in incomings.items())), f"Constraint_{node_to_str[node]}"
+def solve(A_eq, b_eq, sink_nodes=None):
 
-    return model, sink_nodes
+    # An empty graph would break the LP solver
+    if A_eq.shape[0] == 0:
+        return None
 
+    # There is nothing to optimize, any point satisfying the constraints resolves the delegations
+    c = np.zeros(A_eq.shape[1])
 
-def solve(model, sink_nodes=None):
-
-    model.solve(PULP_CBC_CMD(msg=0, options=["primalT=5e-3", "dualT=5e-3"]))
+    return linprog(c, A_eq=A_eq, b_eq=b_eq, bounds=(None, None), method="highs")
 
 def resolve_delegations(delegations: dict, nodes: List[str]) -> Tuple[dict, list]:
     """
-    Resolves delegations in a weighted delegation graph using a LP model.
+    Resolves delegations in a weighted delegation graph using a LP model, solved with HiGHS.
 
     This function constructs an LP problem where each node receives voting power from incoming delegations. 
     The objective is to ensure that all delegation flows are properly accounted for, including cycles, 
@@ -56,7 +40,7 @@ def resolve_delegations(delegations: dict, nodes: List[str]) -> Tuple[dict, list
                                 "A": {"B": 0.5},
                                 "C": {"A": 1.0, "B": 0.5}
                             }
-        nodes (list): A list of all nodes in the delegation graph. Nodes must be strings.
+        nodes (list): A list of all nodes in the delegation graph.
 
     Returns:
        tuple:
@@ -70,18 +54,20 @@ def resolve_delegations(delegations: dict, nodes: List[str]) -> Tuple[dict, list
             and should thus be ignored when treating the output
         - Sink nodes (nodes without outgoing delegations) must collectively hold the total power.
     """
-    model, sink_nodes = set_up(delegations, nodes)
+    A_eq, b_eq, sink_nodes = set_up(delegations, nodes)
+
+    result = solve(A_eq, b_eq)
 
-    solve(model)
+    if result is None:
+        return {}, sink_nodes
 
-    str_to_node_map = get_str_to_node_map(nodes)
+    sink_set = set(sink_nodes)
 
-    # Return the computed values
-    if (model.status == 1):
+    # Return the computed values. The position of a node in nodes is its index in the solution
+    if (result.status == 0):
         return {
-            str_to_node_map[var.name]: (value(var) if str_to_node_map[var.name] in sink_nodes else 0.0)
-            for var in model.variables()
-            if var.name != "__dummy" # Exclude the dummy variable created by PuLP
+            node: (float(result.x[i]) if node in sink_set else 0.0)
+            for i, node in enumerate(nodes)
         }, sink_nodes
     else:
-        raise Exception(f"LP model is {constants.LpStatus[model.status]}. {model}")
+        raise Exception(f"LP model is unsolved: {result.message}")
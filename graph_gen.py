@@ -1,13 +1,52 @@
 import numpy as np
+from functools import lru_cache
+from typing import List, Tuple
 
 WEIGHTS = [(i + 1) / 10 for i in range(1, 10)]
 
-def get_random_delegation_weights(n: int) -> list:
+@lru_cache(maxsize=None)
+def get_delegation_weights_distribution(n: int) -> Tuple[List[Tuple[float, ...]], np.ndarray]:
+    """
+    Enumerates every list of weights get_random_delegation_weights can return for a given `n`, together with its
+    probability under the following random search: for each of the first n-1 weights, up to 11 tries are drawn from
+    WEIGHTS and the first one smaller than the remaining weight is taken. The remainder becomes the last weight.
+
+    Parameters:
+    - n (int): Maximum number of weights to generate. Must be positive.
+
+    Returns:
+    - list[tuple[float, ...]]: All possible outcomes.
+    - np.ndarray: The cumulative probabilities of the outcomes, in the same order.
+    """
+    outcomes = []
+    probabilities = []
+
+    def enumerate_outcomes(steps_left, diff, weights, probability):
+        if steps_left == 0:
+            # If we have not used all the weights, add the last one
+            outcomes.append(weights + ((round(diff, 1),) if diff > 0 else ()))
+            probabilities.append(probability)
+            return
+
+        fitting = [w for w in WEIGHTS if diff - w > 0]
+        p_no_fit = (1 - len(fitting) / len(WEIGHTS)) ** 11
+        if p_no_fit > 0:
+            enumerate_outcomes(steps_left - 1, diff, weights, probability * p_no_fit)
+        for w in fitting:
+            # Given that some try fits, the first fitting one is uniform among all fitting weights
+            enumerate_outcomes(steps_left - 1, diff - w, weights + (w,), probability * (1 - p_no_fit) / len(fitting))
+
+    enumerate_outcomes(n - 1, 1, (), 1.0)
+
+    return outcomes, np.cumsum(probabilities)
+
+def get_random_delegation_weights(n: int, rng: np.random.Generator = None) -> list:
     """
     Generates up to `n` random weights from the set of {0.1, 0.2, ..., 0.9} such that they sum to exactly 1.0.
 
     Parameters:
     - n (int): Maximum number of weights to generate.
+    - rng (np.random.Generator, optional): The random generator to draw from. A fresh, unseeded one is used if omitted.
 
     Returns:
     - list[float]: A list of up to `n` values that sum to 1.0.
@@ -16,43 +55,65 @@ def get_random_delegation_weights(n: int) -> list:
         - If `n <= 0`, an empty list is returned.
         - The algorithm may find less than 'n' weights, if e.g. n = 2, the algorithm may choose 1.0 as weight and only return [1.0]
         - The algorithm ensures no negative values
+        - The possible outcomes for each `n` are tabulated once (see get_delegation_weights_distribution), so each call
+            only draws a single random number
     """
     if n <= 0: return []
 
-    diff = 1
-    weights = []
-    for i in range(n-1):
-        for _ in range(11):
-            # Tries 10 times to find a valid weight. If this is not possible the algorithm gives up
-            choice = np.random.choice(WEIGHTS)
-            if diff - choice > 0:
-                weights += [choice]
-                diff -= weights[-1]
-                break
-    
-    # If we have not used all the weights, add the last one
-    if diff > 0:
-        weights += [round(diff, 1)]
-
-    return weights
+    if rng is None:
+        rng = np.random.default_rng()
+
+    outcomes, cumulative_probabilities = get_delegation_weights_distribution(n)
+    index = np.searchsorted(cumulative_probabilities, rng.random(), side="right")
+
+    # Guards against the last cumulative probability being slightly below 1.0 due to rounding
+    return list(outcomes[min(index, len(outcomes) - 1)])
 
 def is_connected_to_sink(delegations, start_node):
+    # Iterative DFS, so that long delegation chains do not hit the recursion limit
     visited = set()
+    stack = [start_node]
 
-    def dfs(node):
+    while stack:
+        node = stack.pop()
         if node in visited:
-            return False 
-        
+            continue
+
         visited.add(node)
 
-        # A sink is a node with no outgoing edges 
-        if node not in delegations or not delegations[node]:  
-            return True  
+        # A sink is a node with no outgoing edges
+        neighbors = delegations.get(node)
+        if not neighbors:
+            return True
+
+        stack.extend(neighbors)
+
+    return False
+
+def get_random_delegates(num_nodes: int, width: int, rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Draws `width` distinct nodes from {0, ..., num_nodes - 1} uniformly at random, once for each of the `num_nodes` nodes.
+
+    Parameters:
+    - num_nodes (int): The number of nodes to draw from, which is also the number of draws.
+    - width (int): The number of distinct nodes per draw. Must not exceed `num_nodes`.
+    - rng (np.random.Generator, optional): The random generator to draw from. A fresh, unseeded one is used if omitted.
+
+    Returns:
+    - np.ndarray: An array of shape (num_nodes, width), where row i holds the candidate delegates of node i.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
 
-        # Recur for all outgoing connections
-        return any(dfs(neighbor) for neighbor in delegations[node])
+    delegates = rng.integers(0, num_nodes, size=(num_nodes, width))
 
-    return dfs(start_node)
+    # Redraws every row that contains a node twice. Rejecting such rows keeps the remaining ones uniform
+    while True:
+        sorted_delegates = np.sort(delegates, axis=1)
+        duplicates = (sorted_delegates[:, 1:] == sorted_delegates[:, :-1]).any(axis=1)
+        if not duplicates.any():
+            return delegates
+        delegates[duplicates] = rng.integers(0, num_nodes, size=(int(duplicates.sum()), width))
 
 def create_delegation_graph(num_nodes: int, seed: int = None):
     """
@@ -74,38 +135,50 @@ def create_delegation_graph(num_nodes: int, seed: int = None):
     - Delegation weights are all multiples of 0.1
     """
 
-    np.random.seed(seed)
+    rng = np.random.default_rng(seed)
 
     nodes = list(range(num_nodes))
     delegations = {}
+
+    # Draws all random decisions up front: how many delegations each node shall have, and to whom
+    all_num_delegations = rng.integers(0, np.minimum(3, np.arange(num_nodes)) + 1)
+    all_delegates = get_random_delegates(num_nodes, min(3, num_nodes), rng)
+
     for i in range(num_nodes):
         node = i     
-        # Choose how many delegations this node shall have
-        num_delegations = np.random.randint(0, min(3, i) + 1)
+        num_delegations = all_num_delegations[i]
         if num_delegations > 0:
-            delegation_weights = get_random_delegation_weights(num_delegations)
+            delegation_weights = get_random_delegation_weights(num_delegations, rng)
 
-            delegates = np.random.choice(nodes, num_delegations, replace=False)
+            delegates = all_delegates[i, :num_delegations]
             # Sorting assures that if the node delegates to itself, this delegation is first in the list.
             delegates = sorted(delegates, reverse=True) 
 
             for j in range(len(delegation_weights)):
-                delegate = delegates[j]
+                delegate = int(delegates[j])
 
                 # Avoids self delegations of any weight
                 # This causes the outdgoing power of this node to no longer be 1, but that will be fixed later on
                 if (delegate == node):
                         continue
                 else:
-                    # Add the delegation to the dictionary, initializing if necessary
-                    delegations.setdefault(node, {}).setdefault(delegate, 0)
-                    delegations[node][delegate] += delegation_weights[j]
-                    if not is_connected_to_sink(delegations, node):
+                    # Every node is connected to a sink at all times. So a new delegation can only cut a node off from
+                    # all sinks if it is the first one of the node and its delegate is not a sink, since the delegate's
+                    # path may lead back through the node. Only in that case the graph needs to be searched.
+                    node_delegations = delegations.get(node)
+                    if node_delegations is None:
+                        node_delegations = {}
+                        delegations[node] = node_delegations
+                    needs_check = not node_delegations and bool(delegations.get(delegate))
+
+                    # Add the delegation to the dictionary
+                    node_delegations[delegate] = node_delegations.get(delegate, 0.0) + delegation_weights[j]
+                    if needs_check and not is_connected_to_sink(delegations, node):
                         # If the delegation graph is not connected to a sink, remove the delegation
                         # This causes the outdgoing power of this node to no longer be 1, but that will be fixed later on
-                        delegations[node][delegate] -= delegation_weights[j]
-                        if delegations[node][delegate] <= 0:
-                            del delegations[node][delegate]
+                        node_delegations[delegate] -= delegation_weights[j]
+                        if node_delegations[delegate] <= 0:
+                            del node_delegations[delegate]
                 
             # Ensure node has outgoing delegations summing to 1.0
             if node in delegations and sum(delegations[node].values()) < 1.0:
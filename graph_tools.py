@@ -1,5 +1,6 @@
 import networkx as nx
 import random
+from collections import defaultdict
 from typing import Union
 import logger_creator
 
@@ -8,7 +9,7 @@ def prepare_graph(vertices, edges, sink_frac=0.2, seed=None):
     Transforms a graph into a valid Liquid Democracy Delegation Graph by performing the following operations:
     
     - Merges multiple (parallel) edges between the same nodes into a single edge, eliminating duplicates.
-        Of the duplicate edges only one, random edge is kept.
+        The weight of the merged edge is the sum of the duplicate edges' weights.
     - Ensures that at least sinks % (default 20%) of nodes are sinks (outdegree 0)
         Edges are removed randomly until this condition is met
     - Normalizes the edge weights for each node such that the sum of outgoing edge weights equals 1.
@@ -35,41 +36,53 @@ def prepare_graph(vertices, edges, sink_frac=0.2, seed=None):
     if seed is not None:
         random.seed(seed)
 
-    # 1. Create initial graph
-    G = nx.MultiDiGraph()
-    G.add_nodes_from(vertices)
+    # 1. Collect the edges. Multiple (parallel) edges between the same nodes are merged into one by summing their
+    # weights, so that no intermediate MultiDiGraph needs to be built
+    edge_weights = defaultdict(float)
     for edge in edges:
         if len(edge) == 3:
             u, v, weight = edge
-            G.add_edge(u, v, weight=weight)
         else:
             u, v = edge
-            G.add_edge(u, v, weight=1)
+            weight = 1
+        edge_weights[(u, v)] += weight
 
-    # 2. Merge multiple edges into one. The duplicated edges are discarded.
+    # 2. Create the graph from the merged edges
     DG = nx.DiGraph()
-    DG.add_nodes_from(G.nodes())  
-
-    for u, v, w in G.edges(data='weight'):
-        if DG.has_edge(u, v):
-            DG[u][v]['weight'] += w
-        else :
-            DG.add_edge(u, v, weight=w)
+    DG.add_nodes_from(vertices)
+    DG.add_edges_from((u, v, {'weight': w}) for (u, v), w in edge_weights.items())
 
     # 3. If there are not a lot of sinks (less than 20% of nodes with outdegree 0), remove some edges
-    while sum(DG.out_degree(n) == 0 for n in DG.nodes()) < sink_frac * len(G.nodes):
-        node = random.choice(list(DG.nodes()))
-        if DG.out_degree(node) > 0:
-            DG.remove_edges_from(list(DG.out_edges(node)))
+    # Removing the outgoing edges of a node only turns that node into a sink, so the sinks can simply be counted
+    num_nodes = len(DG)
+    nonsinks = [n for n, succ in DG._succ.items() if succ]
+    num_sinks = num_nodes - len(nonsinks)
+    threshold = sink_frac * num_nodes
+    while num_sinks < threshold and nonsinks:
+        # Picks a random non-sink and drops it from the candidates by swapping it with the last one
+        i = random.randrange(len(nonsinks))
+        node = nonsinks[i]
+        nonsinks[i] = nonsinks[-1]
+        nonsinks.pop()
+
+        DG.remove_edges_from([(node, v) for v in DG._succ[node]])
+        num_sinks += 1
 
     # 4. Normalize edge weights
+    # The edge attribute dicts are scaled in place, accessing the adjacency dict directly avoids NetworkX's views
     for node in DG.nodes():
-        w_sum = sum(w for _, _, w in DG.out_edges(node, data='weight'))
-        for u, v, w in DG.out_edges(node, data='weight'):
-            DG.add_edge(u, v, weight=w / w_sum)
+        succ = DG._succ[node]
+        if not succ:
+            continue
+        w_sum = 0.0
+        for d in succ.values():
+            w_sum += d['weight']
+        inv_w_sum = 1.0 / w_sum
+        for d in succ.values():
+            d['weight'] *= inv_w_sum
 
     # 5. Remove closed delegation cycles (terminal strongly connected components (SCCs))
-    initial_amount_of_nodes = len(DG.nodes())
+    initial_amount_of_nodes = len(DG)
     def collapse_all_terminal_sccs(graph, lost_node_name="cycle_sink_node"):
         # 1) find all SCCs
         sccs = list(nx.strongly_connected_components(graph))
@@ -77,41 +90,39 @@ def prepare_graph(vertices, edges, sink_frac=0.2, seed=None):
         # 2) identify the terminal ones
         terminal_sccs = []
         for scc in sccs:
-            # ignore sinks
-            if any(graph.out_degree(n) == 0 for n in scc):
-                continue
-            # check whether there are any edges out of the scc
-            # (checks if all outgoing edges are to nodes also in the SCC)
-            if all(v in scc for u in scc for _, v in graph.out_edges(u)):
+            # An SCC is terminal if none of its nodes is a sink and all their outgoing edges stay inside the SCC.
+            # Looks at the successor dicts directly, so that no edge tuples have to be created
+            succs = (graph._succ[n] for n in scc)
+            if all(succ and all(v in scc for v in succ) for succ in succs):
                 terminal_sccs.append(scc)
 
         # 3) collapse each
         for scc in terminal_sccs:
             for node in scc:
-                for u, _ in list(graph.in_edges(node)):
+                # The edges into the SCC need not be removed one by one, removing the SCC's nodes drops them
+                for u, d in graph._pred[node].items():
                     if u not in scc:
-                        w = graph[u][node].get("weight", 1.0)
-                        if graph.has_edge(u, lost_node_name):
-                            graph[u][lost_node_name]["weight"] += w
+                        w = d.get("weight", 1.0)
+                        lost_edge = graph._succ[u].get(lost_node_name)
+                        if lost_edge is not None:
+                            lost_edge["weight"] += w
                         else:
                             graph.add_edge(u, lost_node_name, weight=w)
-                        graph.remove_edge(u, node)
             graph.remove_nodes_from(scc)
 
         # returns the amount of terminal SCCs that were collapsed
         return len(terminal_sccs)
 
-    # Keep removing terminal SCCs until none are left
+    # A single pass removes all terminal SCCs: the SCCs are computed once, and collapsing cannot create new terminal
+    # ones, since every redirected edge points to the lost node, which is a sink
     amount_of_collapsed_sccs = collapse_all_terminal_sccs(DG)
 
-    final_amount_of_nodes = len([n for n in DG.nodes() if n != "lost"])
+    final_amount_of_nodes = len(DG) - ("cycle_sink_node" in DG)
 
     # Log results
     logger, handler = logger_creator.create_logger(name_prefix="prepare_graph")
     logger.info(f"Initially {initial_amount_of_nodes} nodes, after collapsing terminal SCCs "
                 f"{final_amount_of_nodes} nodes remain. In total {amount_of_collapsed_sccs} terminal SCCs were collapsed.")
-    logger.removeHandler(handler)
-    handler.close()
 
     return DG
 
@@ -170,12 +181,10 @@ def invert_graph(graph):
     - dict: A new dictionary representing the inverted graph, where all edges 
       have been reversed but retain their original weights.
     """
-    inverted_graph = {}
+    inverted_graph = defaultdict(dict)
 
     for node, neighbors in graph.items():
         for neighbor, weight in neighbors.items():
-            if neighbor not in inverted_graph:
-                inverted_graph[neighbor] = {}
-            inverted_graph[neighbor][node] = weight  
+            inverted_graph[neighbor][node] = weight
 
-    return inverted_graph
\ No newline at end of file
+    return dict(inverted_graph)
\ No newline at end of file
@@ -17,7 +17,8 @@ def visualize_delegation_graph(delegations: dict, powers: dict = None):
     Notes:
         - The powers return from an LP model need to be cleaned, so that non-sink nodes have a power of 0, otherwise
             they will be visualized as if held power (blue instead of gray).
-        - The function will attempt to find an available port starting from 8050 until 8055.
+        - The function will attempt to find an available port starting from 8050 until 8055. If none of them is
+            available, a RuntimeError is raised.
         - The function assumes all nodes in the graph are present in the powers dict. If a node is missing from this dict, it will not be visualized.
         - If no powers dict is passed, the algorithm doesn't visualize any node who are not keys in the delegations dict
         - If no powers dict is passed, each node will be visualized as if it had no power (gray)
@@ -39,16 +40,15 @@ def visualize_delegation_graph(delegations: dict, powers: dict = None):
     node_df["color"] = node_df["sink?"].map({True: "blue", False: "gray"})
 
     
-    edges = []
-    for node, neighbors in delegations.items():
-        for neighbor, weight in neighbors.items():
-            edges.append((node, neighbor, weight))
-
-    edge_df = pd.DataFrame(edges, columns=["from", "to", "label"])
+    # Builds the edge columns directly, instead of one tuple per edge
+    edge_df = pd.DataFrame({
+        "from": [node for node, neighbors in delegations.items() for _ in neighbors],
+        "to": [neighbor for neighbors in delegations.values() for neighbor in neighbors],
+        "label": [weight for neighbors in delegations.values() for weight in neighbors.values()]
+    })
     edge_df["label"] = edge_df["label"].astype(str)
 
-    port = 8050
-    while port < 8055:
+    for port in range(8050, 8055):
         try:
             Jaal(edge_df, node_df).plot(directed=True,
                                         port=port,
@@ -59,10 +59,9 @@ def visualize_delegation_graph(delegations: dict, powers: dict = None):
                                                 'title': "power"
                                             }
                                         })
-            
-            break
-        except Exception as e:
+            return
+        except OSError as e:
+            # Most likely the port is already in use, so the next one is tried
             print(e)
-            port += 1
 
-    print("Graph visualization failed because no ports were found or there was another error.")
\ No newline at end of file
+    raise RuntimeError("Graph visualization failed because no free port between 8050 and 8054 was found.")
@@ -1,8 +1,46 @@
-import sys, os
-sys.path.append(os.path.abspath("/Users/DavidHolzwarth/Uni/EPFL/bachelors-thesis"))
-
+import LE
 import logger_creator
+import numpy as np
 import time 
+from numba import njit
+
+@njit(cache=True, fastmath=True)
+def iterate_csr(indptr, src_idx, weights, out_weights, values, cutoff):
+    """
+    Runs the iteration of iterate_delegations on CSR arrays of the incoming delegations (see LE.to_csr).
+    Updates `values` in place and returns the number of iterations.
+
+    One iteration is the linear update v <- v + W v - diag(out_weights) v, where W holds the incoming delegations and
+    out_weights[u] is the total weight u delegates away. Every node gathers its incoming power row by row, then gives
+    away what it delegates in a single subtraction.
+    """
+    count = 0
+
+    # Each iteration reads the previous values from one buffer and writes the new ones to the other, then the two
+    # buffers swap roles. This way no array is allocated or copied per iteration
+    current = values
+    new = np.empty_like(values)
+
+    while True:
+
+        total_change = 0.0
+
+        for node in range(len(current)):
+            incoming = 0.0
+            for k in range(indptr[node], indptr[node + 1]):
+                incoming += weights[k] * current[src_idx[k]]
+            change = out_weights[node] * current[node]
+            new[node] = current[node] + incoming - change
+            total_change += change
+
+        count += 1
+        current, new = new, current
+
+        if total_change < cutoff:
+            # After an odd number of iterations the result is in the scratch buffer
+            if count % 2 == 1:
+                values[:] = current
+            return count
 
 def iterate_delegations(delegations: dict, nodes: list, cutoff: float = 0.001) -> dict:
     """
@@ -24,32 +62,17 @@ def iterate_delegations(delegations: dict, nodes: list, cutoff: float = 0.001) -
     
     Notes:
         - If the delegations are not resolvable because there is a clique with no sink, the function will not terminate.
+        - The iteration runs in a Numba-compiled kernel (iterate_csr), the first call includes its compilation.
     """
+    indptr, src_idx, weights = LE.to_csr(delegations, nodes, LE.get_node_to_int_map(nodes))
+    out_weights = np.bincount(src_idx, weights=weights, minlength=len(nodes))
+
     # Initialize node values
-    values = {node: 1.0 for node in nodes}
+    values = np.ones(len(nodes), dtype=np.float64)
 
-    count = 0
-    
-    while True:
+    count = iterate_csr(indptr, src_idx, weights, out_weights, values, cutoff)
 
-        temp_values = values.copy()  # Store previous iteration values
-        total_change = 0.0
-        
-        for node, incoming_delegations in delegations.items():
-            incoming_delegations = delegations[node]
-
-            for src, weight in incoming_delegations.items():
-                values[node] += weight * temp_values[src]
-                values[src] -= weight * temp_values[src]
-                total_change += weight * temp_values[src]
-        
-        count += 1
-        if total_change < cutoff:
+    logger, handler = logger_creator.create_logger(name_prefix="iterative")
+    logger.info(f"Iterated {count} times ({len(nodes)} nodes)")
 
-            logger, handler = logger_creator.create_logger(name_prefix="iterative")
-            logger.info(f"Iterated {count} times ({len(nodes)} nodes)")
-            logger.removeHandler(handler)
-            handler.close()
-            
-            return values
-        
\ No newline at end of file
+    return dict(zip(nodes, values.tolist()))
@@ -3,16 +3,21 @@ from datetime import datetime
 import os
 from typing import Tuple
 
+# Loggers created so far, by name. Reusing them avoids opening a new file handler on every call
+_LOGGERS = {}
+
 def create_logger(name_prefix="log", level=logging.INFO, folder="logs") -> Tuple[logging.Logger, logging.Handler]:
     """
     Creates a logger that writes to a uniquely named file in a specified folder.
+    Loggers are cached by name, so repeated calls within the same hour return the same logger and handler.
 
     Examlple usage:
         
         logger, handler = logger_creator.create_logger(name_prefix="iterative")
         logger.info(f"Iterated {count} times ({len(nodes)} nodes)")
-        logger.removeHandler(handler)
-        handler.close()
+
+    The handler is shared between calls, so callers should not remove or close it. If they do, the next call sets up
+    a new handler.
     
     Args:
         name_prefix (str): Prefix for the filename.
@@ -35,6 +40,11 @@ def create_logger(name_prefix="log", level=logging.INFO, folder="logs") -> Tuple
     # Create the log filename
     timestamp = datetime.now().strftime("%Y%m%d_%H")
     logger_name = f"{name_prefix}_{timestamp}"
+    # Reuses the cached logger, unless its handler has been removed from it in the meantime
+    cached = _LOGGERS.get(logger_name)
+    if cached is not None and cached[1] in cached[0].handlers:
+        return cached
+
     log_filepath = os.path.join(full_log_folder, f"{logger_name}.log")
     
     # Set up the logger
@@ -47,4 +57,6 @@ def create_logger(name_prefix="log", level=logging.INFO, folder="logs") -> Tuple
     logger.setLevel(level)
     logger.propagate = False  # Avoid double logging
 
+    _LOGGERS[logger_name] = (logger, handler)
+
     return logger, handler